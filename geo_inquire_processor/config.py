@@ -2,55 +2,61 @@
 Configuration settings for the GEO-INQUIRE audio processor.
 """
 
+import functools
 import os
+import shutil
 from pathlib import Path
 
 # Final sampling rate for downsampling (Hz)
 FINAL_SAMPLING_RATE = 300
 
+# Longest accepted input file (seconds); longer files are rejected as implausible
+MAX_FILE_SECONDS = 86400
+
+# Default number of worker processes used to convert files in parallel
+MAX_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
 # FFmpeg configuration - can be set via environment variable or auto-detected
 FFMPEG_BIN = os.environ.get('FFMPEG_BIN', None)
 FFMPEG_EXE = os.environ.get('FFMPEG_EXE', None)
 FFPROBE_EXE = os.environ.get('FFPROBE_EXE', None)
 
+# Common Windows locations
+_COMMON_PATHS = tuple(Path(p) for p in (
+    r"C:\ffmpeg\bin",
+    r"C:\Program Files\ffmpeg\bin",
+    r"C:\Program Files (x86)\ffmpeg\bin",
+))
+
+@functools.lru_cache(maxsize=1)
 def setup_ffmpeg():
     """
     Setup FFmpeg paths. Checks environment variables first,
     then common installation locations.
+    The lookup runs once per process; later calls return the cached result.
+    Returns (ffmpeg_exe, ffprobe_exe), or (None, None) if not found.
     """
-    global FFMPEG_EXE, FFPROBE_EXE
-    
     if FFMPEG_EXE and FFPROBE_EXE:
         return FFMPEG_EXE, FFPROBE_EXE
     
-    # Common Windows locations
-    common_paths = [
-        r"C:\ffmpeg\bin",
-        r"C:\Program Files\ffmpeg\bin",
-        r"C:\Program Files (x86)\ffmpeg\bin",
-    ]
-    
     # Check if ffmpeg is in PATH
-    import shutil
     ffmpeg_path = shutil.which("ffmpeg")
     ffprobe_path = shutil.which("ffprobe")
     
     if ffmpeg_path and ffprobe_path:
-        FFMPEG_EXE = ffmpeg_path
-        FFPROBE_EXE = ffprobe_path
-        return FFMPEG_EXE, FFPROBE_EXE
+        return ffmpeg_path, ffprobe_path
     
-    # Try common paths
-    for path in common_paths:
-        ffmpeg_exe = os.path.join(path, "ffmpeg.exe")
-        ffprobe_exe = os.path.join(path, "ffprobe.exe")
-        if os.path.exists(ffmpeg_exe) and os.path.exists(ffprobe_exe):
-            FFMPEG_EXE = ffmpeg_exe
-            FFPROBE_EXE = ffprobe_exe
-            if path not in os.environ.get("PATH", ""):
-                os.environ["PATH"] += os.pathsep + path
-            return FFMPEG_EXE, FFPROBE_EXE
+    # Try common paths, listing each directory once instead of probing each executable
+    for path in _COMMON_PATHS:
+        try:
+            with os.scandir(path) as entries:
+                names = {entry.name.lower() for entry in entries}
+        except OSError:
+            continue
+        if "ffmpeg.exe" in names and "ffprobe.exe" in names:
+            if str(path) not in os.environ.get("PATH", ""):
+                os.environ["PATH"] += os.pathsep + str(path)
+            return str(path / "ffmpeg.exe"), str(path / "ffprobe.exe")
     
     # Return None if not found - will raise error when needed
     return None, None
-
@@ -5,16 +5,24 @@ Graphical User Interface for the GEO-INQUIRE Audio Processing Tool.
 import os
 import re
 import threading
+import types
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, Toplevel, Label
-from datetime import timedelta
 import webbrowser
 
+from .config import MAX_WORKERS
 from .processor import AudioProcessor, extract_times_from_wav, FINAL_SAMPLING_RATE
 
 
+# File extension picked up when a folder is selected (matched case-insensitively)
+WAV_EXT = '.wav'
+
+# Time zone offset (e.g. "UTC+8", "UTC-05") and FDSN network code formats
+_TZ_RE = re.compile(r'^UTC([+-])(\d{1,2})$')
+_NET_CODE_RE = re.compile(r'^[A-Z]{1,2}$')
+
 # StationXML field tooltips
-STATIONXML_TOOLTIPS = {
+_STATIONXML_TOOLTIPS = {
     "sender": "Name of the person or organization creating this metadata (e.g., 'Geo-INQUIRE Tool, PLOCAN').",
     "source": "Project or data source description (e.g., 'OBS campaign 2024').",
     "module": "Optional. Software module or script used to create this metadata.",
@@ -41,40 +49,88 @@ STATIONXML_TOOLTIPS = {
     "input_units_name": "Use 'Pa' for hydrophones (SI unit).",
     "output_units_name": "Use 'V' (Volts) or 'count'. Avoid non-SI."
 }
+STATIONXML_TOOLTIPS = types.MappingProxyType(_STATIONXML_TOOLTIPS)
 
 
 def create_tooltip(widget, text):
-    """Create a tooltip for a widget."""
+    """
+    Create a tooltip for a widget.
+    The tooltip window is built on the first hover and then only shown/hidden.
+    """
     def on_enter(event):
-        top = Toplevel(widget)
-        top.wm_overrideredirect(True)
-        top.geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
-        label = Label(top, text=text, background="light yellow", relief="solid", borderwidth=1,
-                      wraplength=400, justify="left")
-        label.pack(ipadx=1)
-        widget.tooltip = top
+        tooltip = getattr(widget, 'tooltip', None)
+        if tooltip is None:
+            tooltip = Toplevel(widget)
+            tooltip.wm_overrideredirect(True)
+            label = Label(tooltip, text=text, background="light yellow", relief="solid", borderwidth=1,
+                          wraplength=400, justify="left")
+            label.pack(ipadx=1)
+            widget.tooltip = tooltip
+        tooltip.geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
+        tooltip.deiconify()
 
     def on_leave(event):
-        if hasattr(widget, 'tooltip'):
-            widget.tooltip.destroy()
-            del widget.tooltip
+        if getattr(widget, 'tooltip', None) is not None:
+            widget.tooltip.withdraw()
 
     widget.bind("<Enter>", on_enter)
     widget.bind("<Leave>", on_leave)
 
 
+def bind_scrollregion(canvas, delay=50):
+    """
+    Keep a canvas's scrollregion in sync with its contents.
+    Bursts of <Configure> events (e.g. while resizing) are coalesced so the
+    bounding box is recomputed once, delay milliseconds after the last event.
+    """
+    def update():
+        canvas.scrollregion_after = None
+        canvas.configure(scrollregion=canvas.bbox("all"))
+
+    def schedule(event):
+        pending = getattr(canvas, 'scrollregion_after', None)
+        if pending:
+            canvas.after_cancel(pending)
+        canvas.scrollregion_after = canvas.after(delay, update)
+
+    canvas.bind('<Configure>', schedule)
+
+
+def _parse_kv_file(path):
+    """
+    Read a metadata text file of key=value lines into a dictionary.
+    Empty lines, comment lines starting with '#' and lines without '=' are skipped.
+    """
+    metadata = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith('#'):
+                continue
+            key, sep, value = line.partition('=')
+            if sep:
+                metadata[key.strip()] = value.strip()
+    return metadata
+
+
 class Application(tk.Tk):
     """Main application window for the GEO-INQUIRE Audio Processing Tool."""
     
-    def __init__(self):
+    def __init__(self, max_workers=MAX_WORKERS):
         super().__init__()
-        self.processor = AudioProcessor()
+        self.processor = AudioProcessor(max_workers=max_workers)
+        self.max_workers = self.processor.max_workers
         self.file_paths = []
         self.stationxml_validated = False
+        # (file_path, (start, end)) for the first selected file, filled in the background
+        self._first_file_times = None
+        self._first_file_times_ready = threading.Event()
         
         self.geometry("1800x800")
         self.title("GEO-INQUIRE Audio Processing Tool - WAV to FLAC/MiniSEED Converter")
-        self.attributes('-topmost', True)
+        self.topmost_var = tk.BooleanVar(value=True)
+        self.update_topmost()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         
         # Main frame with scrolling
         main_frame = ttk.Frame(self)
@@ -86,10 +142,27 @@ class Application(tk.Tk):
         main_scrollbar_x = ttk.Scrollbar(main_frame, orient="horizontal", command=main_canvas.xview)
         main_scrollbar_x.pack(side="bottom", fill="x")
         main_canvas.configure(yscrollcommand=main_scrollbar_y.set, xscrollcommand=main_scrollbar_x.set)
-        main_canvas.bind('<Configure>', lambda e: main_canvas.configure(scrollregion=main_canvas.bbox("all")))
+        bind_scrollregion(main_canvas)
+        
+        # Wheel events are accumulated and applied once per idle cycle, so a burst of
+        # events from a smooth-scrolling device triggers a single redraw
+        wheel_delta = 0
+        wheel_pending = False
+        
+        def _flush_wheel():
+            nonlocal wheel_delta, wheel_pending
+            units = int(wheel_delta / 120)
+            wheel_delta -= units * 120
+            wheel_pending = False
+            if units:
+                main_canvas.yview_scroll(-units, "units")
         
         def _on_mousewheel(event):
-            main_canvas.yview_scroll(-1 * int(event.delta/120), "units")
+            nonlocal wheel_delta, wheel_pending
+            wheel_delta += event.delta
+            if not wheel_pending:
+                wheel_pending = True
+                self.after_idle(_flush_wheel)
         main_canvas.bind("<Enter>", lambda e: main_canvas.bind_all("<MouseWheel>", _on_mousewheel))
         main_canvas.bind("<Leave>", lambda e: main_canvas.unbind_all("<MouseWheel>"))
         
@@ -167,6 +240,15 @@ class Application(tk.Tk):
         )
         self.plot_check.pack(pady=5)
         
+        # Stay-on-top checkbox (switched off automatically once processing starts)
+        self.topmost_check = ttk.Checkbutton(
+            self.scroll_frame,
+            text="Keep this window on top of other windows",
+            variable=self.topmost_var,
+            command=self.update_topmost
+        )
+        self.topmost_check.pack(pady=5)
+        
         # Start processing button
         self.start_button = ttk.Button(
             self.scroll_frame,
@@ -221,7 +303,7 @@ class Application(tk.Tk):
         emso_scrollbar = ttk.Scrollbar(self.emso_label_frame, orient="vertical", command=emso_canvas.yview)
         emso_scrollbar.pack(side="right", fill="y")
         emso_canvas.configure(yscrollcommand=emso_scrollbar.set)
-        emso_canvas.bind('<Configure>', lambda e: emso_canvas.configure(scrollregion=emso_canvas.bbox("all")))
+        bind_scrollregion(emso_canvas)
         
         self.emso_scroll_frame = ttk.Frame(emso_canvas)
         emso_canvas.create_window((0, 0), window=self.emso_scroll_frame, anchor="nw")
@@ -242,14 +324,14 @@ class Application(tk.Tk):
         ]
         
         self.metadata_entries = {}
-        for label in emso_fields:
-            frame = ttk.Frame(self.emso_scroll_frame)
-            frame.pack(fill='x', pady=1)
+        for row, label in enumerate(emso_fields):
             label_clean = label.replace('*', '')
             display_label = f"{label_clean} *" if '*' in label else label_clean
-            ttk.Label(frame, text=display_label, width=40, anchor='w').pack(side='left')
-            entry = ttk.Entry(frame, width=80)
-            entry.pack(side='left', pady=1)
+            ttk.Label(self.emso_scroll_frame, text=display_label, width=40, anchor='w').grid(
+                row=row, column=0, sticky='w', pady=1
+            )
+            entry = ttk.Entry(self.emso_scroll_frame, width=80)
+            entry.grid(row=row, column=1, sticky='w', pady=1)
             self.metadata_entries[label_clean] = entry
         
         auto_time_label_emso = ttk.Label(
@@ -258,7 +340,7 @@ class Application(tk.Tk):
             foreground="blue",
             font=("Arial", 9, "italic")
         )
-        auto_time_label_emso.pack(pady=4, anchor='w')
+        auto_time_label_emso.grid(row=len(emso_fields), column=0, columnspan=2, pady=4, sticky='w')
     
     def _create_eida_section(self):
         """Create EIDA StationXML metadata input section."""
@@ -308,7 +390,7 @@ class Application(tk.Tk):
         eida_scrollbar = ttk.Scrollbar(self.eida_label_frame, orient="vertical", command=eida_canvas.yview)
         eida_scrollbar.pack(side="right", fill="y")
         eida_canvas.configure(yscrollcommand=eida_scrollbar.set)
-        eida_canvas.bind('<Configure>', lambda e: eida_canvas.configure(scrollregion=eida_canvas.bbox("all")))
+        bind_scrollregion(eida_canvas)
         
         self.eida_scroll_frame = ttk.Frame(eida_canvas)
         eida_canvas.create_window((0, 0), window=self.eida_scroll_frame, anchor="nw")
@@ -343,18 +425,18 @@ class Application(tk.Tk):
         }
         
         self.stationxml_entries = {}
-        for key, label in eida_fields.items():
-            frame = ttk.Frame(self.eida_scroll_frame)
-            frame.pack(fill='x', pady=2)
-            
-            ttk.Label(frame, text=label, width=40, anchor='w').pack(side='left')
+        for row, (key, label) in enumerate(eida_fields.items()):
+            ttk.Label(self.eida_scroll_frame, text=label, width=40, anchor='w').grid(
+                row=row, column=0, sticky='w', pady=2
+            )
             
-            entry = ttk.Entry(frame, width=100)
-            entry.pack(side='left', pady=2)
+            entry = ttk.Entry(self.eida_scroll_frame, width=100)
+            entry.grid(row=row, column=1, sticky='w', pady=2)
             self.stationxml_entries[key] = entry
             
-            if key in STATIONXML_TOOLTIPS:
-                create_tooltip(entry, STATIONXML_TOOLTIPS[key])
+            tooltip_text = STATIONXML_TOOLTIPS.get(key)
+            if tooltip_text:
+                create_tooltip(entry, tooltip_text)
         
         auto_time_label_xml = ttk.Label(
             self.eida_scroll_frame,
@@ -362,7 +444,7 @@ class Application(tk.Tk):
             foreground="blue",
             font=("Arial", 9, "italic")
         )
-        auto_time_label_xml.pack(pady=4, anchor='w')
+        auto_time_label_xml.grid(row=len(eida_fields), column=0, columnspan=2, pady=4, sticky='w')
     
     def select_files(self):
         """Select individual WAV files."""
@@ -371,18 +453,54 @@ class Application(tk.Tk):
             filetypes=[("WAV files", "*.wav"), ("WAV files", "*.WAV")]
         )
         if self.file_paths:
-            self.path_label.config(text=f"Selected files: {', '.join(self.file_paths)}")
+            n_files = len(self.file_paths)
+            preview = ', '.join(self.file_paths[:3])
+            if n_files > 3:
+                preview += f", … (+{n_files - 3} more)"
+            self.path_label.config(text=f"Selected files ({n_files}): {preview}")
+            self._start_first_times_prefetch()
     
     def select_folder(self):
         """Select a folder containing WAV files."""
         folder_path = filedialog.askdirectory(title="Select Folder of WAV files")
         if folder_path:
-            self.file_paths = [
-                os.path.join(folder_path, f) 
-                for f in os.listdir(folder_path) 
-                if f.lower().endswith('.wav')
-            ]
+            with os.scandir(folder_path) as entries:
+                self.file_paths = [
+                    entry.path
+                    for entry in entries
+                    if entry.name.lower().endswith(WAV_EXT) and entry.is_file()
+                ]
+            self.file_paths.sort()
             self.path_label.config(text=f"Selected folder: {folder_path} ({len(self.file_paths)} files)")
+            if self.file_paths:
+                self._start_first_times_prefetch()
+    
+    def _start_first_times_prefetch(self):
+        """Read the first file's start/end times in the background while metadata is entered."""
+        self._first_file_times = None
+        self._first_file_times_ready.clear()
+        threading.Thread(
+            target=self._prefetch_first_times,
+            args=(self.file_paths[0],),
+            daemon=True
+        ).start()
+    
+    def _prefetch_first_times(self, file_path):
+        """Worker for _start_first_times_prefetch; errors are left for start_processing to report."""
+        try:
+            self._first_file_times = (file_path, extract_times_from_wav(file_path))
+        except Exception:
+            self._first_file_times = None
+        finally:
+            self._first_file_times_ready.set()
+    
+    def _get_first_file_times(self):
+        """Return the first file's start/end times, preferring the prefetched result."""
+        self._first_file_times_ready.wait()
+        cached = self._first_file_times
+        if cached is not None and cached[0] == self.file_paths[0]:
+            return cached[1]
+        return extract_times_from_wav(self.file_paths[0])
     
     def select_metadata_file(self):
         """Load EMSO metadata from a text file."""
@@ -391,12 +509,7 @@ class Application(tk.Tk):
             filetypes=[("Text files", "*.txt")]
         )
         if metadata_file:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = {
-                    line.strip().split('=', 1)[0].strip(): line.strip().split('=', 1)[1].strip()
-                    for line in f if '=' in line
-                }
-            self.populate_metadata_fields(metadata)
+            self.populate_metadata_fields(_parse_kv_file(metadata_file))
     
     def select_stationxml_file(self):
         """Load StationXML metadata from a text file."""
@@ -405,27 +518,28 @@ class Application(tk.Tk):
             filetypes=[("Text files", "*.txt")]
         )
         if metadata_file:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = {
-                    line.strip().split('=', 1)[0].strip(): line.strip().split('=', 1)[1].strip()
-                    for line in f if '=' in line
-                }
-            self.populate_stationxml_fields(metadata)
+            self.populate_stationxml_fields(_parse_kv_file(metadata_file))
             self.validate_stationxml_metadata()
     
     def populate_metadata_fields(self, metadata):
         """Populate EMSO metadata fields from dictionary."""
-        for key, entry in self.metadata_entries.items():
-            if key in metadata:
-                entry.delete(0, tk.END)
-                entry.insert(0, metadata[key])
+        entries = self.metadata_entries
+        for key in metadata.keys() & entries.keys():
+            entry = entries[key]
+            entry.delete(0, tk.END)
+            entry.insert(0, metadata[key])
     
     def populate_stationxml_fields(self, metadata):
         """Populate StationXML metadata fields from dictionary."""
-        for key, entry in self.stationxml_entries.items():
-            if key in metadata:
-                entry.delete(0, tk.END)
-                entry.insert(0, metadata[key])
+        entries = self.stationxml_entries
+        for key in metadata.keys() & entries.keys():
+            entry = entries[key]
+            entry.delete(0, tk.END)
+            entry.insert(0, metadata[key])
+    
+    def update_topmost(self):
+        """Apply the stay-on-top preference to the main window."""
+        self.attributes('-topmost', self.topmost_var.get())
     
     def update_metadata_input(self):
         """Enable/disable EMSO metadata fields based on input method."""
@@ -450,26 +564,37 @@ class Application(tk.Tk):
     
     def get_stationxml_data(self):
         """Get StationXML metadata from GUI fields."""
-        stationxml_data = {}
-        for key, entry in self.stationxml_entries.items():
-            stationxml_data[key] = entry.get().strip()
-        return stationxml_data
+        return {key: entry.get().strip() for key, entry in self.stationxml_entries.items()}
     
-    def validate_stationxml_metadata(self):
-        """Validate StationXML metadata fields."""
-        missing_fields = []
-        for key, entry in self.stationxml_entries.items():
-            if not entry.get().strip():
-                missing_fields.append(key)
-            
-            if key == "network_code":
-                entered_code = entry.get().strip()
-                if len(entered_code) != 2:
-                    messagebox.showwarning(
-                        "Network Code Warning",
-                        "Network code should be a 2-letter code officially registered in the FDSN registry.\n"
-                        "See: https://www.fdsn.org/networks/"
-                    )
+    def _snapshot(self):
+        """Read every input widget once into plain Python values."""
+        return {
+            'metadata': self.get_metadata(),
+            'stationxml': self.get_stationxml_data(),
+            'tz': self.tz_offset_entry.get().strip().upper(),
+            'plot': self.plot_var.get()
+        }
+    
+    def validate_stationxml_metadata(self, data=None, quiet=False):
+        """
+        Validate StationXML metadata fields.
+        Validates data (as returned by get_stationxml_data) when given,
+        otherwise the current contents of the fields.
+        With quiet=True no dialog is shown when validation succeeds.
+        """
+        values = self.get_stationxml_data() if data is None else data
+        missing_fields = [key for key, value in values.items() if not value]
+        
+        # Check network code format before reporting the overall result
+        network_code = values.get("network_code", "")
+        if network_code and (len(network_code) != 2 or not _NET_CODE_RE.match(network_code)):
+            messagebox.showwarning(
+                "Non-Standard Network Code",
+                "⚠️ The 'network_code' you entered does not match the standard FDSN 2-letter uppercase format.\n"
+                "Network code should be officially registered in the FDSN registry; "
+                "if it is not, validation with EIDA tools may fail.\n\n"
+                "🧭 You can check official codes here:\nhttps://www.fdsn.org/networks/"
+            )
         
         if missing_fields:
             messagebox.showerror(
@@ -479,19 +604,10 @@ class Application(tk.Tk):
             self.status_label.config(text="Status: StationXML metadata validation failed.", foreground="red")
             self.stationxml_validated = False
         else:
-            messagebox.showinfo("Validation Success", "StationXML metadata validated successfully.")
+            if not quiet:
+                messagebox.showinfo("Validation Success", "StationXML metadata validated successfully.")
             self.status_label.config(text="Status: StationXML metadata validated successfully.", foreground="green")
             self.stationxml_validated = True
-            
-            # Check network code format
-            network_code = self.stationxml_entries.get("network_code").get().strip()
-            if not re.match(r'^[A-Z]{1,2}$', network_code):
-                messagebox.showwarning(
-                    "Non-Standard Network Code",
-                    "⚠️ The 'network_code' you entered does not match the standard FDSN 1–2 character uppercase format.\n"
-                    "If this is not an official FDSN code, validation with EIDA tools may fail.\n\n"
-                    "🧭 You can check official codes here:\nhttps://www.fdsn.org/networks/"
-                )
     
     def start_processing(self):
         """Start processing files."""
@@ -499,15 +615,15 @@ class Application(tk.Tk):
             messagebox.showerror("Error", "No files or folder selected.")
             return
         
+        snapshot = self._snapshot()
+        # Fields may have been edited since an earlier validation, so the snapshot is always checked
+        self.validate_stationxml_metadata(snapshot['stationxml'], quiet=True)
         if not self.stationxml_validated:
-            messagebox.showerror("Error", "Please validate StationXML metadata before processing.")
             return
         
         try:
             # Parse time zone offset
-            tz_str = self.tz_offset_entry.get().strip().upper()
-            pattern = r'^UTC([+-])(\d{1,2})$'
-            m = re.match(pattern, tz_str)
+            m = _TZ_RE.match(snapshot['tz'])
             if not m:
                 raise ValueError("Time zone offset must be in the format: UTC±X or UTC±XX (e.g., UTC+8, UTC-05, UTC+10).")
             sign, digits = m.groups()
@@ -515,14 +631,13 @@ class Application(tk.Tk):
             if abs(tz_offset) >= 24:
                 raise ValueError("Time zone offset (in hours) must be between -24 and +24.")
             
-            # Get metadata
-            metadata = self.get_metadata()
-            stationxml_data = self.get_stationxml_data()
+            metadata = snapshot['metadata']
+            stationxml_data = snapshot['stationxml']
             
             # Extract times from first file for preview
-            local_start_time, local_end_time = extract_times_from_wav(self.file_paths[0])
-            utc_start_time = local_start_time - timedelta(hours=tz_offset)
-            utc_end_time = local_end_time - timedelta(hours=tz_offset)
+            local_start_time, local_end_time = self._get_first_file_times()
+            utc_start_time = local_start_time - tz_offset * 3600
+            utc_end_time = local_end_time - tz_offset * 3600
             utc_start_str = utc_start_time.isoformat()
             utc_end_str = utc_end_time.isoformat()
             
@@ -531,13 +646,63 @@ class Application(tk.Tk):
             stationxml_data['time_coverage_start'] = utc_start_str
             stationxml_data['time_coverage_end'] = utc_end_str
             
-            # Start processing in background thread
+            # Start processing in background thread so the window stays responsive
+            # and no longer covers other applications during a long batch run
+            self.topmost_var.set(False)
+            self.update_topmost()
+            self.start_button.config(state=tk.DISABLED)
+            self.status_label.config(
+                text=f"Status: Processing {len(self.file_paths)} files with {self.max_workers} workers...",
+                foreground="blue"
+            )
             threading.Thread(
-                target=self.processor.process_files,
-                args=(self.file_paths, metadata, stationxml_data, tz_offset, self.plot_var.get())
+                target=self._run_processing,
+                args=(list(self.file_paths), metadata, stationxml_data, tz_offset, snapshot['plot'])
             ).start()
-            self.destroy()
         except Exception as e:
             messagebox.showerror("Processing Error", str(e))
             self.status_label.config(text=f"Status: Error during processing: {e}", foreground="red")
-
+    
+    def _on_close(self):
+        """Close the window, unless a processing run would be cut off mid-file."""
+        if str(self.start_button['state']) == tk.DISABLED:
+            messagebox.showwarning(
+                "Processing Running",
+                "Files are still being processed. Please wait until processing finishes "
+                "before closing, otherwise partially written output files may be left behind."
+            )
+            return
+        self.destroy()
+    
+    def _run_processing(self, file_paths, metadata, stationxml_data, tz_offset, plot_preference):
+        """Run the processor in a worker thread and report the result back to the GUI."""
+        try:
+            successful_files = self.processor.process_files(
+                file_paths, metadata, stationxml_data, tz_offset, plot_preference,
+                progress_callback=lambda done, total: self.after(0, self._processing_progress, done, total)
+            )
+        except Exception as e:
+            self.after(0, self._processing_failed, e)
+        else:
+            self.after(0, self._processing_finished, successful_files, len(file_paths))
+    
+    def _processing_progress(self, done, total_files):
+        """Show how many files of the running batch are done."""
+        self.status_label.config(
+            text=f"Status: {done} of {total_files} files done ({self.max_workers} workers)...",
+            foreground="blue"
+        )
+    
+    def _processing_finished(self, successful_files, total_files):
+        """Show the outcome of a finished processing run."""
+        self.start_button.config(state=tk.NORMAL)
+        self.status_label.config(
+            text=f"Status: Processed {successful_files} out of {total_files} files successfully.",
+            foreground="green" if successful_files == total_files else "red"
+        )
+    
+    def _processing_failed(self, error):
+        """Show an error raised while processing."""
+        self.start_button.config(state=tk.NORMAL)
+        messagebox.showerror("Processing Error", str(error))
+        self.status_label.config(text=f"Status: Error during processing: {error}", foreground="red")
@@ -2,15 +2,18 @@
 Core audio processing functions for WAV to FLAC/MiniSEED conversion.
 """
 
+import functools
+import io
+import math
 import os
 import re
-import tempfile
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
 
 import numpy as np
 import soundfile as sf
-from scipy.signal import firwin, lfilter, resample
-from pydub import AudioSegment
+from scipy.signal import firwin, oaconvolve
+import soxr
 from mutagen.flac import FLAC
 import obspy
 from obspy.core import UTCDateTime
@@ -20,8 +23,13 @@ from obspy.core.inventory import (
 import plotly.graph_objects as go
 from dateutil import parser
 from lxml import etree
+from tqdm import tqdm
 
-from .config import FINAL_SAMPLING_RATE, setup_ffmpeg
+from .config import FINAL_SAMPLING_RATE, MAX_FILE_SECONDS, setup_ffmpeg
+
+_EXT_RE = re.compile(r'\.\w+$')
+_FULL_DT_RE = re.compile(r'(\d{4}-\d{2}-\d{2})[ _](\d{2}-\d{2}-\d{2})')
+_COMPACT_DT_RE = re.compile(r'(\d{8})[ _](\d{6})')
 
 
 def extract_datetime_from_filename(filename):
@@ -36,11 +44,10 @@ def extract_datetime_from_filename(filename):
     The returned datetime is naive (tzinfo removed).
     """
     # Remove file extension
-    name = re.sub(r'\.\w+$', '', filename)
+    name = _EXT_RE.sub('', filename)
     
     # 1. Try full datetime with explicit separators: e.g. "2024-05-17_09-25-33"
-    pattern_full = r'(\d{4}[-]\d{2}[-]\d{2})[ _](\d{2}[-]\d{2}[-]\d{2})'
-    match = re.search(pattern_full, name)
+    match = _FULL_DT_RE.search(name)
     if match:
         try:
             date_part = match.group(1)
@@ -48,12 +55,11 @@ def extract_datetime_from_filename(filename):
             dt_str = f"{date_part} {time_part}"
             dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
             return dt
-        except Exception:
+        except ValueError:
             pass
 
     # 2. Try compact datetime: e.g. "20180726_141241"
-    pattern_compact = r'(\d{8})[ _](\d{6})'
-    match = re.search(pattern_compact, name)
+    match = _COMPACT_DT_RE.search(name)
     if match:
         try:
             date_part = match.group(1)
@@ -61,14 +67,14 @@ def extract_datetime_from_filename(filename):
             dt_str = f"{date_part} {time_part}"
             dt = datetime.strptime(dt_str, "%Y%m%d %H%M%S")
             return dt
-        except Exception:
+        except ValueError:
             pass
 
     # 3. Fallback: fuzzy parse entire filename
     try:
         dt = parser.parse(name, fuzzy=True)
         return dt.replace(tzinfo=None)
-    except Exception:
+    except (ValueError, OverflowError):
         return datetime.utcnow()
 
 
@@ -79,42 +85,60 @@ def generate_start_end_time(wav_file_name, duration_seconds):
     Computes the end time as start time plus the file's duration.
     Returns start and end times in ISO format.
     """
-    dt = extract_datetime_from_filename(wav_file_name)
-    start_time = UTCDateTime(dt.isoformat())
-    end_time = start_time + duration_seconds
+    start_time, end_time = _start_end_utcdatetime(wav_file_name, duration_seconds)
     return start_time.isoformat(), end_time.isoformat()
 
 
+def _start_end_utcdatetime(wav_file_name, duration_seconds):
+    """
+    Same as generate_start_end_time, but returns UTCDateTime objects
+    instead of round-tripping them through ISO strings.
+    """
+    start_time = UTCDateTime(extract_datetime_from_filename(wav_file_name))
+    return start_time, start_time + duration_seconds
+
+
+def _norm_inplace(x):
+    """Scale a float array in place to a peak amplitude of 1 (all-zero input is left as is)."""
+    max_val = float(np.abs(x).max())
+    if max_val == 0:
+        return x
+    return np.multiply(x, 1.0 / max_val, out=x)
+
+
 def plot_signals(original_signal, filtered_signal, downsampled_signal, original_rate, target_rate):
     """Plot comparison of original, filtered, and downsampled signals."""
     original_samples_to_plot = original_rate
     downsampled_samples_to_plot = target_rate
 
-    original_signal_norm = (original_signal / np.max(np.abs(original_signal))
-                              if np.max(np.abs(original_signal)) != 0 else original_signal)
-    filtered_signal_norm = (filtered_signal / np.max(np.abs(filtered_signal))
-                            if np.max(np.abs(filtered_signal)) != 0 else filtered_signal)
-    downsampled_signal_norm = (downsampled_signal / np.max(np.abs(downsampled_signal))
-                               if np.max(np.abs(downsampled_signal)) != 0 else downsampled_signal)
+    original_signal_norm = _norm_inplace(np.array(original_signal, dtype=np.float32))
+    filtered_signal_norm = _norm_inplace(np.array(filtered_signal, dtype=np.float32))
+    downsampled_signal_norm = _norm_inplace(np.array(downsampled_signal, dtype=np.float32))
 
     t_original = np.linspace(0, 1, original_samples_to_plot, endpoint=False)
     t_filtered = np.linspace(0, 1, original_samples_to_plot, endpoint=False)
     t_downsampled = np.linspace(0, 1, downsampled_samples_to_plot, endpoint=False)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t_original, y=original_signal_norm[:original_samples_to_plot],
-                             mode='lines', name='Original Signal'))
-    fig.add_trace(go.Scatter(x=t_filtered, y=filtered_signal_norm[:original_samples_to_plot],
-                             mode='lines', name='Filtered Signal'))
-    fig.add_trace(go.Scatter(x=t_downsampled, y=downsampled_signal_norm[:downsampled_samples_to_plot],
-                             mode='lines+markers', name=f'Downsampled Signal ({FINAL_SAMPLING_RATE} Hz)',
-                             marker=dict(color='gold')))
-    for i in range(downsampled_samples_to_plot):
-        filtered_index = int(i * (original_rate / target_rate))
-        fig.add_trace(go.Scatter(x=[t_downsampled[i], t_filtered[filtered_index]],
-                                 y=[downsampled_signal_norm[i], filtered_signal_norm[filtered_index]],
-                                 mode='lines', line=dict(color='green', dash='dash'),
-                                 showlegend=False))
+    fig.add_trace(go.Scattergl(x=t_original, y=original_signal_norm[:original_samples_to_plot],
+                               mode='lines', name='Original Signal'))
+    fig.add_trace(go.Scattergl(x=t_filtered, y=filtered_signal_norm[:original_samples_to_plot],
+                               mode='lines', name='Filtered Signal'))
+    fig.add_trace(go.Scattergl(x=t_downsampled, y=downsampled_signal_norm[:downsampled_samples_to_plot],
+                               mode='lines+markers', name=f'Downsampled Signal ({FINAL_SAMPLING_RATE} Hz)',
+                               marker=dict(color='gold')))
+
+    # All interpolation lines go in one trace; NaN rows break it into separate segments
+    filtered_indices = (np.arange(downsampled_samples_to_plot) * (original_rate / target_rate)).astype(int)
+    segments_x = np.full((downsampled_samples_to_plot, 3), np.nan)
+    segments_y = np.full((downsampled_samples_to_plot, 3), np.nan)
+    segments_x[:, 0] = t_downsampled
+    segments_x[:, 1] = t_filtered[filtered_indices]
+    segments_y[:, 0] = downsampled_signal_norm[:downsampled_samples_to_plot]
+    segments_y[:, 1] = filtered_signal_norm[filtered_indices]
+    fig.add_trace(go.Scattergl(x=segments_x.ravel(), y=segments_y.ravel(),
+                               mode='lines', line=dict(color='green', dash='dash'),
+                               showlegend=False))
     fig.update_layout(
         title='First Second of the first file: Signal Downsampling and Interpolation',
         xaxis_title='Time [s]',
@@ -126,7 +150,17 @@ def plot_signals(original_signal, filtered_signal, downsampled_signal, original_
 
 
 def convert_wav_to_flac(wav_file_path, flac_file_path):
-    """Convert WAV file to FLAC format."""
+    """
+    Convert WAV file to FLAC format with pydub.
+    Requires FFmpeg; the processing pipeline itself encodes FLAC with soundfile.
+    """
+    if not all(setup_ffmpeg()):
+        raise RuntimeError(
+            "FFmpeg not found. Please install FFmpeg and set FFMPEG_BIN environment variable, "
+            "or ensure ffmpeg is in your system PATH."
+        )
+    # Imported here: pydub warns on import when FFmpeg is missing, and nothing else needs it
+    from pydub import AudioSegment
     audio = AudioSegment.from_file(wav_file_path, format="wav")
     audio.export(flac_file_path, format="flac")
 
@@ -137,82 +171,163 @@ def add_metadata_to_flac(flac_file_path, metadata):
     Includes per-file timestamps (time_coverage_start, time_coverage_end)
     and the initial sampling rate.
     """
-    audio = FLAC(flac_file_path)
     metadata["date_created"] = datetime.utcnow().isoformat()  # Always in UTC
-    for key, value in metadata.items():
-        audio[key] = str(value)
+    audio = FLAC(flac_file_path)
+    # All tags go into the Vorbis comment block at once, so the file is rewritten a single time
+    audio.update({key: str(value) for key, value in metadata.items()})
     audio.save()
 
 
+def check_sample_rate(rate, file_path):
+    """Raise ValueError if a WAV file's sample rate is outside the plausible range."""
+    if not (8000 <= rate <= 400000):
+        raise ValueError(f"Unrealistic sample rate {rate} detected in file {file_path}.")
+
+
 def get_wav_info(file_path):
     """Read WAV file and return sample rate and data."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     data, rate = sf.read(file_path)
-    if not (8000 <= rate <= 400000):
-        raise ValueError(f"Unrealistic sample rate {rate} detected in file {file_path}.")
+    check_sample_rate(rate, file_path)
     return rate, data
 
 
-def downsample_wav(data, original_rate, target_rate=FINAL_SAMPLING_RATE):
+@functools.lru_cache(maxsize=32)
+def _design_fir(original_rate, target_rate, numtaps=101):
     """
-    Downsample audio data with low-pass filtering.
-    Returns (downsampled_data, filtered_data).
+    Design the low-pass FIR prototype for a pair of rates.
+    Cached, since batches usually share one rate; the array is read-only.
     """
-    if original_rate == target_rate:
-        return data, data
-    
-    # Normalize
-    max_val = np.max(np.abs(data))
-    if max_val == 0:
-        max_val = 1
-    data = data / max_val
-    
-    # Design low-pass FIR filter
     cutoff = min(150, 0.5 * target_rate)
-    numtaps = 101
     fir_filter = firwin(numtaps, cutoff / (0.5 * original_rate))
-    filtered_data = lfilter(fir_filter, 1.0, data)
-    
-    # Downsample in chunks to avoid memory issues
-    chunk_size = 1000000
-    chunks = []
-    for i in range(0, len(filtered_data), chunk_size):
-        chunk = filtered_data[i:i + chunk_size]
-        chunk_downsampled = resample(chunk, int(len(chunk) * (target_rate / original_rate)))
-        chunks.append(chunk_downsampled)
+    fir_filter.flags.writeable = False
+    return fir_filter
+
+
+def lowpass_filter(data, original_rate, target_rate=FINAL_SAMPLING_RATE):
+    """
+    Apply the FIR low-pass filter used to illustrate the downsampling in plots.
+    Returns the filtered data at the original rate, aligned with the input
+    (the linear-phase delay of the filter is removed).
+    """
+    data = np.asarray(data)
+    fir_filter = _design_fir(original_rate, target_rate)
+    # Filter along time only; multichannel data gets the same filter per channel
+    fir_filter = fir_filter.reshape((-1,) + (1,) * (data.ndim - 1))
+    return oaconvolve(data, fir_filter, mode='same', axes=0)
+
+
+def downsample_wav(data, original_rate, target_rate=FINAL_SAMPLING_RATE):
+    """
+    Normalize and downsample audio data held in memory.
+    Returns (downsampled_data, filtered_data): the int16 signal at target_rate
+    and the normalized, low-pass filtered signal at original_rate.
+    Files are converted by downsample_to_flac, which streams instead.
+    """
+    # Normalize a float32 working copy, so the caller's array is untouched
+    data = _norm_inplace(np.array(data, dtype=np.float32))
+    if original_rate == target_rate:
+        return _to_int16(data.copy(), np.iinfo(np.int16).max), data
     
-    downsampled_data = np.concatenate(chunks)
-    downsampled_data = downsampled_data * np.iinfo(np.int16).max
-    downsampled_data = downsampled_data.astype(np.int16)
-    return downsampled_data, filtered_data
+    # Anti-aliasing is done by libsoxr's polyphase resampler
+    downsampled_data = soxr.resample(data, original_rate, target_rate, quality='HQ')
+    filtered_data = lowpass_filter(data, original_rate, target_rate)
+    return _to_int16(downsampled_data, np.iinfo(np.int16).max), filtered_data
+
+
+def _to_int16(data, scale):
+    """
+    Scale float samples and round them to int16, in place on the float buffer.
+    Values outside the int16 range (e.g. filter overshoot) saturate instead of
+    wrapping around.
+    """
+    np.multiply(data, scale, out=data)
+    np.rint(data, out=data)
+    np.clip(data, np.iinfo(np.int16).min, np.iinfo(np.int16).max, out=data)
+    return data.astype(np.int16)
+
+
+def downsample_to_flac(src, flac_file_path, target_rate=FINAL_SAMPLING_RATE, blocksize=1 << 20):
+    """
+    Stream an open soundfile.SoundFile through the downsampler into a
+    16-bit FLAC file, reading the source a single time.
+    Only the 300 Hz float32 output is kept in memory until the input peak
+    is known; it is then normalized, quantized and written in one go.
+    The resampler keeps its state between blocks, so the output is the same as
+    resampling the whole signal in one call, without seams at block boundaries.
+    """
+    # One preallocated block buffer is refilled for every block read
+    blocksize = max(1, min(blocksize, src.frames))
+    block_shape = (blocksize,) if src.channels == 1 else (blocksize, src.channels)
+    block_buffer = np.empty(block_shape, dtype=np.float32)
+
+    resampler = None
+    if src.samplerate != target_rate:
+        resampler = soxr.ResampleStream(src.samplerate, target_rate, src.channels,
+                                        dtype='float32', quality='HQ')
+    # The output is written into one preallocated array; libsoxr emits
+    # ceil(frames * target_rate / rate) samples, the margin is only a safeguard
+    out_frames = math.ceil(src.frames * target_rate / src.samplerate) + 16
+    resampled = np.empty((out_frames,) + block_shape[1:], dtype=np.float32)
+    filled = 0
+
+    def append(chunk):
+        nonlocal resampled, filled
+        end = filled + len(chunk)
+        if end > len(resampled):
+            resampled = np.resize(resampled, (end,) + resampled.shape[1:])
+        resampled[filled:end] = chunk
+        filled = end
+
+    peak = 0.0
+    for block in src.blocks(out=block_buffer):
+        # max and -min give the peak without an np.abs temporary
+        peak = max(peak, float(np.max(block, initial=0.0)), -float(np.min(block, initial=0.0)))
+        append(resampler.resample_chunk(block) if resampler is not None else block)
+    if resampler is not None:
+        # Flush the samples still held in the resampler's filter state
+        append(resampler.resample_chunk(np.zeros((0,) + block_shape[1:], dtype=np.float32), last=True))
+    resampled = resampled[:filled]
+
+    # Resampling is linear, so the normalization is applied to the (much shorter) output
+    sf.write(flac_file_path, _to_int16(resampled, np.iinfo(np.int16).max / (peak or 1.0)),
+             target_rate, format='FLAC', subtype='PCM_16')
 
 
 def convert_data_format(data):
     """Convert data to int16 format."""
     if data.dtype != np.int16:
-        data = (data * np.iinfo(np.int16).max).astype(np.int16)
+        # Quantize a float32 working copy in place, so the caller's array is untouched
+        data = _to_int16(np.array(data, dtype=np.float32), np.iinfo(np.int16).max)
     return data
 
 
-def extract_times_from_wav(file_path):
+def extract_times_from_wav(file_path, rate=None, frames=None):
     """
     Extract start and end times from WAV filename.
+    The duration comes from rate and frames when the caller already has them,
+    otherwise from the WAV header.
     Returns (start_time, end_time) as UTCDateTime objects.
     """
     base_name = os.path.basename(file_path)
-    rate, data = get_wav_info(file_path)
-    duration = len(data) / rate
-    if duration > 86400:
+    if rate is None or frames is None:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        info = sf.info(file_path)
+        rate, frames = info.samplerate, info.frames
+        check_sample_rate(rate, file_path)
+    duration = frames / rate
+    if duration > MAX_FILE_SECONDS:
         raise ValueError(f"File {file_path} has an implausibly long duration ({duration} seconds).")
-    start_iso, end_iso = generate_start_end_time(base_name, duration)
-    start_time = UTCDateTime(start_iso)
-    end_time = UTCDateTime(end_iso)
-    return start_time, end_time
+    return _start_end_utcdatetime(base_name, duration)
 
 
-def flac_to_miniseed(flac_file_path, output_path):
-    """Convert FLAC file to MiniSEED format."""
+def flac_to_miniseed(flac_file_path, output_path, buffer=None):
+    """
+    Convert FLAC file to MiniSEED format.
+    An optional preallocated int16 buffer is reused for the decoded samples.
+    """
     try:
         flac_meta = FLAC(flac_file_path)
         if 'time_coverage_start' in flac_meta:
@@ -224,25 +339,61 @@ def flac_to_miniseed(flac_file_path, output_path):
     except Exception:
         start_time = UTCDateTime()
     
-    flac_audio = AudioSegment.from_file(flac_file_path, format="flac")
-    samples = np.array(flac_audio.get_array_of_samples())
+    # Decode with libFLAC (through soundfile) straight into an int16 array
+    with sf.SoundFile(flac_file_path) as flac_audio:
+        sampling_rate = flac_audio.samplerate
+        frames = flac_audio.frames
+        use_buffer = buffer is not None and frames <= len(buffer)
+        if flac_audio.channels > 1:
+            # Mix multichannel recordings down to a single trace; float32 holds
+            # the int16 channel sums exactly at half the size of float64
+            mixed = flac_audio.read(dtype='int16').mean(axis=1, dtype=np.float32)
+            # Round like _to_int16 does, rather than truncating toward zero
+            np.rint(mixed, out=mixed)
+            if use_buffer:
+                samples = buffer[:frames]
+                np.copyto(samples, mixed, casting='unsafe')
+            else:
+                samples = mixed.astype(np.int16)
+        elif use_buffer:
+            samples = flac_audio.read(dtype='int16', out=buffer[:frames])
+        else:
+            samples = flac_audio.read(dtype='int16')
     stream = obspy.Stream()
     trace = obspy.Trace(data=samples)
-    trace.stats.sampling_rate = flac_audio.frame_rate
+    trace.stats.sampling_rate = sampling_rate
     trace.stats.starttime = start_time
     stream.append(trace)
     stream.write(output_path, format='MSEED')
 
 
+@functools.lru_cache(maxsize=4)
+def _stationxml_xpaths(namespace):
+    """
+    Compiled XPath expressions used to post-process StationXML,
+    for documents in the given default namespace (or none).
+    """
+    prefix = "s:" if namespace else ""
+    namespaces = {"s": namespace} if namespace else None
+    return {
+        "source": etree.XPath(f"{prefix}Source", namespaces=namespaces),
+        "sender": etree.XPath(f"{prefix}Sender", namespaces=namespaces),
+        "end_dates": etree.XPath(f".//{prefix}EndDate", namespaces=namespaces),
+        "networks": etree.XPath(f"{prefix}Network", namespaces=namespaces),
+        "identifier": etree.XPath(f"{prefix}Identifier", namespaces=namespaces),
+        "station": etree.XPath(f"{prefix}Station", namespaces=namespaces),
+    }
+
+
 def generate_stationxml_obspy(wav_file_name, stationxml_data, duration_seconds, tz_offset):
     """
     Generate EIDA-compliant StationXML file.
     Returns the path to the generated XML file.
     """
     # Compute start/end with offset
-    start_iso, end_iso = generate_start_end_time(wav_file_name, duration_seconds)
-    start_time = UTCDateTime(start_iso) - timedelta(hours=tz_offset)
-    end_time = UTCDateTime(end_iso) - timedelta(hours=tz_offset)
+    start_time, end_time = _start_end_utcdatetime(wav_file_name, duration_seconds)
+    start_time -= tz_offset * 3600
+    end_time -= tz_offset * 3600
 
     # Gather GUI fields
     sender = stationxml_data.get("sender", "")
@@ -302,159 +453,258 @@ def generate_stationxml_obspy(wav_file_name, stationxml_data, duration_seconds,
 
     inventory = Inventory(networks=[network], source=sender)
     xml_filename = f"{os.path.splitext(wav_file_name)[0]}.station.xml"
-    inventory.write(xml_filename, format="STATIONXML")
+    # Serialize in memory; the file is only written once, after post-processing
+    xml_buffer = io.BytesIO()
+    inventory.write(xml_buffer, format="STATIONXML")
+    xml_buffer.seek(0)
 
     # Post-process with lxml to ensure compliance
     xml_parser = etree.XMLParser(remove_blank_text=True)
-    tree = etree.parse(xml_filename, xml_parser)
+    tree = etree.parse(xml_buffer, xml_parser)
     root = tree.getroot()
-    ns_pref = f"{{{root.nsmap[None]}}}" if None in root.nsmap else ""
+    namespace = root.nsmap.get(None)
+    ns_pref = f"{{{namespace}}}" if namespace else ""
+    xpaths = _stationxml_xpaths(namespace)
 
-    # Ensure <Source> before <Sender>
-    sender_el = root.find(f"{ns_pref}Sender")
+    # Ensure <Source> comes first
     if source:
-        src_el = root.find(f"{ns_pref}Source") or etree.Element(f"{ns_pref}Source")
+        sources = xpaths["source"](root)
+        if sources:
+            src_el = sources[0]
+        else:
+            src_el = etree.Element(f"{ns_pref}Source")
+            root.insert(0, src_el)
         src_el.text = source
-        if src_el.getparent() is None and sender_el is not None:
-            idx = list(root).index(sender_el)
-            root.insert(idx, src_el)
 
-    # Ensure <Sender> text
-    if sender_el is None:
+    # Ensure <Sender> text, right after <Source>
+    senders = xpaths["sender"](root)
+    if senders:
+        sender_el = senders[0]
+    else:
         sender_el = etree.Element(f"{ns_pref}Sender")
-        root.insert(0, sender_el)
+        sources = xpaths["source"](root)
+        root.insert(root.index(sources[0]) + 1 if sources else 0, sender_el)
     sender_el.text = sender
 
     # Remove all <EndDate> children (EIDA standard requirement)
-    for ed in root.xpath(f".//{ns_pref}EndDate"):
+    for ed in xpaths["end_dates"](root):
         ed.getparent().remove(ed)
 
     # Under each <Network>, force <Identifier> first, <Station> last
-    for net in root.findall(f"{ns_pref}Network"):
-        ident = net.find(f"{ns_pref}Identifier")
-        if ident is None:
+    for net in xpaths["networks"](root):
+        idents = xpaths["identifier"](net)
+        if idents:
+            ident = idents[0]
+            net.remove(ident)
+        else:
             ident = etree.Element(f"{ns_pref}Identifier")
-            net.insert(0, ident)
         ident.text = network_identifier
-        net.remove(ident)
         net.insert(0, ident)
-        st = net.find(f"{ns_pref}Station")
-        if st is not None:
-            net.remove(st)
-            net.append(st)
+        stations = xpaths["station"](net)
+        if stations:
+            net.remove(stations[0])
+            net.append(stations[0])
 
     tree.write(xml_filename, pretty_print=True, xml_declaration=True, encoding="UTF-8")
     return xml_filename
 
 
+@functools.lru_cache(maxsize=1)
+def _decode_buffer():
+    """
+    Return this process's reusable int16 decode buffer, allocating it on first use.
+    It holds the longest accepted file at FINAL_SAMPLING_RATE. The cache lives at
+    module level, so each worker process allocates it once for all its files
+    rather than once per pickled task.
+    """
+    return np.empty(FINAL_SAMPLING_RATE * MAX_FILE_SECONDS, dtype=np.int16)
+
+
+def _prefetch_file(file_path, blocksize=1 << 22):
+    """
+    Read a file sequentially and discard the data, so that the following
+    decode is served from the OS page cache instead of the disk.
+    """
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            while f.read(blocksize):
+                pass
+    except OSError:
+        # Missing or unreadable files are reported when they are processed
+        pass
+
+
+def _process_one(processor, file_path, metadata, stationxml_data, tz_offset, plot=False):
+    """
+    Process a single WAV file with the given processor.
+    Returns an (ok, file_path, err) tuple so failures can be reported by the caller.
+    """
+    try:
+        processor.process_one(file_path, metadata, stationxml_data, tz_offset, plot=plot)
+    except Exception as e:
+        return False, file_path, str(e)
+    return True, file_path, None
+
+
 class AudioProcessor:
     """Main processor class for converting WAV files to FLAC and MiniSEED."""
     
-    def __init__(self):
-        """Initialize the processor and setup FFmpeg."""
-        ffmpeg_exe, ffprobe_exe = setup_ffmpeg()
-        if ffmpeg_exe and ffprobe_exe:
-            AudioSegment.converter = ffmpeg_exe
-            AudioSegment.ffprobe = ffprobe_exe
-            os.environ["FFMPEG_BINARY"] = ffmpeg_exe
-        else:
-            raise RuntimeError(
-                "FFmpeg not found. Please install FFmpeg and set FFMPEG_BIN environment variable, "
-                "or ensure ffmpeg is in your system PATH."
-            )
+    def __init__(self, max_workers=1):
+        """
+        Initialize the processor and setup FFmpeg if it is available.
+        FFmpeg is optional: WAV decoding and FLAC encoding go through soundfile.
+        max_workers is the number of files converted in parallel by process_files.
+        """
+        self.max_workers = max(1, max_workers)
+        self.ffmpeg_exe, self.ffprobe_exe = setup_ffmpeg()
+        self._configure_ffmpeg()
+    
+    def __setstate__(self, state):
+        """
+        Restore a pickled processor inside a worker process.
+        __init__ is not run there, so the FFmpeg configuration is reapplied.
+        """
+        self.__dict__.update(state)
+        self._configure_ffmpeg()
+    
+    def _configure_ffmpeg(self):
+        """Point pydub at the FFmpeg executables found by setup_ffmpeg, if any."""
+        if not (self.ffmpeg_exe and self.ffprobe_exe):
+            return
+        from pydub import AudioSegment
+        AudioSegment.converter = self.ffmpeg_exe
+        AudioSegment.ffprobe = self.ffprobe_exe
+        os.environ["FFMPEG_BINARY"] = self.ffmpeg_exe
     
     def process_wav_file(self, file_path, metadata, plot_first=False, tz_offset=0):
         """
         Process a single WAV file: downsample, convert to FLAC, add metadata.
-        Returns the path to the created FLAC file.
+        Returns (flac_output_path, rate, duration_seconds).
         """
-        rate, data = get_wav_info(file_path)
-        duration_seconds = len(data) / rate
-        if duration_seconds > 86400:
-            raise ValueError(f"File {file_path} has an implausibly long duration ({duration_seconds} seconds).")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
         
-        # Extract file-specific start/end times and initial sampling rate
-        file_start_time, file_end_time = extract_times_from_wav(file_path)
-        # Adjust times by the UTC offset so FLAC metadata reflects UTC time
-        adjusted_start_time = file_start_time - timedelta(hours=tz_offset)
-        adjusted_end_time = file_end_time - timedelta(hours=tz_offset)
-        file_metadata = metadata.copy()
-        file_metadata["time_coverage_start"] = adjusted_start_time.isoformat()
-        file_metadata["time_coverage_end"] = adjusted_end_time.isoformat()
+        flac_output_path = os.path.splitext(file_path)[0] + '.flac'
+        with sf.SoundFile(file_path) as src:
+            rate = src.samplerate
+            check_sample_rate(rate, file_path)
+            duration_seconds = src.frames / rate
+            # Extract file-specific start/end times from the name and the header
+            file_start_time, file_end_time = extract_times_from_wav(file_path, rate, src.frames)
+            # Adjust times by the UTC offset so FLAC metadata reflects UTC time
+            adjusted_start_time = file_start_time - tz_offset * 3600
+            adjusted_end_time = file_end_time - tz_offset * 3600
+            file_metadata = metadata.copy()
+            file_metadata["time_coverage_start"] = adjusted_start_time.isoformat()
+            file_metadata["time_coverage_end"] = adjusted_end_time.isoformat()
+            downsample_to_flac(src, flac_output_path, FINAL_SAMPLING_RATE)
         file_metadata["initial_sampling_rate"] = rate
-
-        if rate > FINAL_SAMPLING_RATE:
-            downsampled_data, filtered_data = downsample_wav(data, rate, FINAL_SAMPLING_RATE)
-            if plot_first:
-                plot_signals(data, filtered_data, downsampled_data, rate, FINAL_SAMPLING_RATE)
-        else:
-            downsampled_data = data
-        
-        downsampled_data = convert_data_format(downsampled_data)
-        
-        # Create a temporary WAV file
-        temp_wav_path = tempfile.mktemp(suffix=".wav")
-        sf.write(temp_wav_path, downsampled_data, FINAL_SAMPLING_RATE)
-        if not os.path.exists(temp_wav_path):
-            raise FileNotFoundError(f"Temporary file {temp_wav_path} was not created.")
-        
-        flac_output_path = file_path.replace('.wav', '.flac').replace('.WAV', '.flac')
-        convert_wav_to_flac(temp_wav_path, flac_output_path)
         add_metadata_to_flac(flac_output_path, file_metadata)
         
-        # Clean up temporary file
-        if os.path.exists(temp_wav_path):
-            os.remove(temp_wav_path)
+        if plot_first:
+            # Only the first second is plotted, so only that part is read back and filtered
+            original, _ = sf.read(file_path, frames=rate)
+            downsampled, _ = sf.read(flac_output_path, frames=FINAL_SAMPLING_RATE, dtype='int16')
+            filtered = lowpass_filter(original, rate, FINAL_SAMPLING_RATE)
+            plot_signals(original, filtered, downsampled, rate, FINAL_SAMPLING_RATE)
         
-        return flac_output_path
+        return flac_output_path, rate, duration_seconds
     
-    def process_files(self, file_paths, metadata, stationxml_data, tz_offset, plot_preference=False):
+    def process_one(self, file_path, metadata, stationxml_data, tz_offset, plot=False):
+        """
+        Process a single WAV file.
+        Creates the FLAC, MiniSEED, and StationXML files for the input and
+        returns their paths.
+        """
+        # Process to FLAC
+        flac_output_path, _, duration_seconds = self.process_wav_file(
+            file_path,
+            metadata,
+            plot_first=plot,
+            tz_offset=tz_offset
+        )
+
+        # Convert to MiniSEED
+        miniseed_output_path = os.path.splitext(file_path)[0] + '.mseed'
+        flac_to_miniseed(flac_output_path, miniseed_output_path, buffer=_decode_buffer())
+
+        # Generate StationXML
+        xml_output_path = generate_stationxml_obspy(
+            wav_file_name=os.path.basename(file_path),
+            stationxml_data=stationxml_data,
+            duration_seconds=duration_seconds,
+            tz_offset=tz_offset
+        )
+
+        print(f"✅ Created files for {file_path}:\n"
+              f"   • FLAC: {flac_output_path}\n"
+              f"   • MiniSEED: {miniseed_output_path}\n"
+              f"   • StationXML (.station.xml): {os.path.abspath(xml_output_path)}")
+        return flac_output_path, miniseed_output_path, xml_output_path
+    
+    def process_files(self, file_paths, metadata, stationxml_data, tz_offset, plot_preference=False,
+                      max_workers=None, progress_callback=None):
         """
         Process multiple WAV files.
         Creates FLAC, MiniSEED, and StationXML files for each input.
+        With max_workers > 1 (defaults to the processor's max_workers) the files
+        are converted in parallel worker processes.
+        progress_callback, if given, is called as progress_callback(done, total)
+        after each file, from the thread that runs process_files.
+        Returns the number of files processed successfully.
         """
+        if max_workers is None:
+            max_workers = self.max_workers
         total_files = len(file_paths)
-        successful_files = 0
         import time
         start_processing_time = time.time()
 
-        for index, file_path in enumerate(file_paths):
-            try:
-                print(f"🔍 Analyzing file {index + 1} of {total_files} — {os.path.basename(file_path)}")
-                
-                # Process to FLAC
-                flac_output_path = self.process_wav_file(
-                    file_path,
-                    metadata,
-                    plot_first=(index == 0 and plot_preference),
-                    tz_offset=tz_offset
-                )
-
-                # Convert to MiniSEED
-                miniseed_output_path = file_path.replace('.wav', '.mseed').replace('.WAV', '.mseed')
-                flac_to_miniseed(flac_output_path, miniseed_output_path)
-
-                # Generate StationXML
-                rate, data = get_wav_info(file_path)
-                duration_seconds = len(data) / rate
-                xml_output_path = generate_stationxml_obspy(
-                    wav_file_name=os.path.basename(file_path),
-                    stationxml_data=stationxml_data,
-                    duration_seconds=duration_seconds,
-                    tz_offset=tz_offset
-                )
-
-                print(f"✅ Created files for {file_path}:\n"
-                      f"   • FLAC: {flac_output_path}\n"
-                      f"   • MiniSEED: {miniseed_output_path}\n"
-                      f"   • StationXML (.station.xml): {os.path.abspath(xml_output_path)}")
-                successful_files += 1
-
-            except Exception as e:
-                print(f"❌ Error processing {file_path}: {e}")
-
+        results = []
+
+        def record(result, report=print):
+            """Keep a per-file result and report a failure as soon as it arrives."""
+            ok, file_path, err = result
+            if not ok:
+                report(f"❌ Error processing {file_path}: {err}")
+            results.append(result)
+            if progress_callback is not None:
+                progress_callback(len(results), total_files)
+
+        if max_workers > 1 and total_files > 1:
+            remaining = list(file_paths)
+            if plot_preference:
+                # The plot opens an interactive window, so the first file is handled here
+                print(f"🔍 Analyzing file 1 of {total_files} — {os.path.basename(remaining[0])}")
+                record(_process_one(self, remaining.pop(0), metadata, stationxml_data,
+                                    tz_offset, plot=True))
+            print(f"🔍 Analyzing {len(remaining)} files with {max_workers} workers")
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_process_one, self, file_path, metadata, stationxml_data, tz_offset)
+                    for file_path in remaining
+                ]
+                for future in tqdm(as_completed(futures), total=len(futures), unit="file"):
+                    # tqdm.write keeps the progress bar intact below the message
+                    record(future.result(), report=tqdm.write)
+        else:
+            # While one file is converted, a background thread reads the next one
+            # from disk so its data is already in the OS cache when its turn comes
+            with ThreadPoolExecutor(max_workers=1) as prefetcher:
+                pending = None
+                for index, file_path in enumerate(file_paths):
+                    # The first file is converted straight away; later ones were prefetched
+                    if pending is not None:
+                        pending.result()
+                    if index + 1 < total_files:
+                        pending = prefetcher.submit(_prefetch_file, file_paths[index + 1])
+                    print(f"🔍 Analyzing file {index + 1} of {total_files} — {os.path.basename(file_path)}")
+                    record(_process_one(self, file_path, metadata, stationxml_data, tz_offset,
+                                        plot=(index == 0 and plot_preference)))
+
+        successful_files = sum(ok for ok, _, _ in results)
         total_elapsed = time.time() - start_processing_time
         elapsed_str = time.strftime('%H:%M:%S', time.gmtime(total_elapsed))
         print(f"\n🎯 Processed {successful_files} out of {total_files} files successfully.")
         print(f"⏱️ Total processing time: {elapsed_str}")
+        return successful_files
 
@@ -3,9 +3,19 @@
 Main entry point for the GEO-INQUIRE Audio Processing Tool.
 """
 
+import argparse
+
+from geo_inquire_processor.config import MAX_WORKERS
 from geo_inquire_processor.gui import Application
 
 if __name__ == "__main__":
-    app = Application()
+    arg_parser = argparse.ArgumentParser(description="GEO-INQUIRE Audio Processing Tool")
+    arg_parser.add_argument(
+        "--workers", "--max-workers", dest="max_workers", type=int, default=MAX_WORKERS,
+        help=f"Number of files converted in parallel (default: {MAX_WORKERS})"
+    )
+    args = arg_parser.parse_args()
+
+    app = Application(max_workers=args.max_workers)
     app.mainloop()
 
@@ -38,10 +38,12 @@ setup(
         "scipy>=1.7.0",
         "soundfile>=0.10.0",
         "pydub>=0.25.0",
+        "soxr>=0.3.0",
         "mutagen>=1.45.0",
         "obspy>=1.4.0",
         "lxml>=4.6.0",
         "python-dateutil>=2.8.0",
+        "tqdm>=4.60.0",
         "plotly>=5.0.0",
         "matplotlib>=3.4.0",
         "Pillow>=8.0.0",